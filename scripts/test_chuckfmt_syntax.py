@@ -1,31 +1,326 @@
 #!/usr/bin/env python3
 import argparse
+import contextlib
+import fcntl
+import hashlib
+import json
+import mmap
+import multiprocessing
 import os
+import queue
+import re
+import selectors
 import shlex
 import shutil
 import subprocess
 import sys
 import tempfile
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
 
+# Bytes of chuck output kept per file; anything beyond is read and discarded.
+CAPTURE_LIMIT = 64 * 1024
+SYNTAX_NEEDLE = b"syntax error"
+# Case-insensitive search straight on the raw bytes, with no lowercased copy of the output.
+SYNTAX_RE = re.compile(re.escape(SYNTAX_NEEDLE), re.IGNORECASE)
+# Seconds a format daemon gets to exit after its stdin is closed before it is terminated.
+DAEMON_EXIT_TIMEOUT = 5.0
+# _IOW(0x94, 9, int) from <linux/fs.h>: share the source file's extents (reflink).
+FICLONE = 0x40049409
 
-def find_ck_files(root: Path) -> List[Path]:
-    return sorted([p for p in root.rglob("*.ck") if p.is_file()])
+
+def reflink_or_copy(src: str, dst: str) -> None:
+    """
+    Private copy of a file: a reflink when the filesystem supports it (btrfs, xfs),
+    otherwise a regular copy2. Either way writes to dst never reach src.
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            shutil.copystat(src, dst)
+            return
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
+
+
+def link_or_copy(src: str, dst: str) -> None:
+    try:
+        os.link(src, dst)
+    except OSError:  # EXDEV across filesystems, EPERM on protected links, ...
+        shutil.copy2(src, dst)
+
+
+def clone_file(src: str, dst: str, link_assets: bool) -> None:
+    if link_assets and not src.endswith(".ck"):
+        link_or_copy(src, dst)
+    else:
+        reflink_or_copy(src, dst)
+
+
+def clone_tree(
+    src_root: Path,
+    dst_root: Path,
+    ignore_names: Set[str],
+    ex: ProcessPoolExecutor,
+    link_assets: bool = False,
+) -> None:
+    """
+    Mirror src_root into dst_root like shutil.copytree. Every file gets a private copy
+    (reflinked where the filesystem allows), since chuck runs the code and scripts may
+    write next to themselves via me.dir(). With link_assets, non-.ck files are hardlinked
+    instead; only safe when nothing in the tree writes to them. Directories are created
+    during the walk; the per-file copy/link syscalls are spread over the worker pool.
+    """
+    srcs: List[str] = []
+    dsts: List[str] = []
+    for dirpath, dirnames, filenames in os.walk(src_root, followlinks=True):
+        dirnames[:] = [d for d in dirnames if d not in ignore_names]
+
+        out_dir = os.path.join(dst_root, os.path.relpath(dirpath, src_root))
+        os.makedirs(out_dir, exist_ok=True)
+        for name in filenames:
+            if name not in ignore_names:
+                srcs.append(os.path.join(dirpath, name))
+                dsts.append(os.path.join(out_dir, name))
+
+    for _ in ex.map(clone_file, srcs, dsts, [link_assets] * len(srcs), chunksize=64):
+        pass
+
+
+def iter_ck_files(root: str, ignore_names: Set[str]) -> Iterator[str]:
+    """
+    Yield .ck file paths under root, pruning ignored directory names on the way down.
+    DirEntry caches the file type from the directory read, so no extra stat per entry.
+    """
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in ignore_names:
+                    yield from iter_ck_files(entry.path, ignore_names)
+            elif entry.name.endswith(".ck") and entry.is_file(follow_symlinks=False):
+                yield entry.path
+
+
+def find_ck_files(root: str, ignore_names: Set[str]) -> List[str]:
+    return sorted(iter_ck_files(root, ignore_names))
+
+
+def parse_cpu_list(text: str) -> Set[int]:
+    """
+    Parse a sysfs CPU list such as "0-3,8,10-11".
+    """
+    cpus: Set[int] = set()
+    for part in text.strip().split(","):
+        if not part:
+            continue
+        lo, _, hi = part.partition("-")
+        cpus.update(range(int(lo), int(hi or lo) + 1))
+    return cpus
+
+
+def physical_core_masks() -> List[Set[int]]:
+    """
+    One CPU set per physical core (hyperthread siblings grouped together), limited to
+    the CPUs this process may run on. Empty when affinity or topology is unavailable.
+    """
+    if not hasattr(os, "sched_getaffinity"):
+        return []
+    allowed = os.sched_getaffinity(0)
+    masks: Dict[FrozenSet[int], None] = {}
+    for cpu in sorted(allowed):
+        path = f"/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list"
+        try:
+            siblings = parse_cpu_list(Path(path).read_text())
+        except (OSError, ValueError):
+            return []
+        masks.setdefault(frozenset(siblings & allowed), None)
+    return [set(m) for m in masks]
+
+
+def pin_worker(core_masks: List[Set[int]], counter) -> None:
+    """
+    Pin this worker, and so every chuck it spawns, to the next physical core in
+    round-robin order.
+    """
+    with counter.get_lock():
+        slot = counter.value
+        counter.value += 1
+    try:
+        os.sched_setaffinity(0, core_masks[slot % len(core_masks)])
+    except OSError:
+        pass  # CPU went offline or cgroup changed; run unpinned rather than break the pool
+
+
+def seal_worker_fds() -> None:
+    """
+    Mark every fd above stderr non-inheritable. A forkserver worker receives the pool's
+    queue pipes as inheritable fds, and since chuck and the formatter are spawned with
+    close_fds=False, every one of them would otherwise hold those pipes open.
+    """
+    for fd_dir in ("/proc/self/fd", "/dev/fd"):
+        try:
+            names = os.listdir(fd_dir)
+        except OSError:
+            continue
+        for name in names:
+            fd = int(name)
+            if fd > 2:
+                try:
+                    os.set_inheritable(fd, False)
+                except OSError:
+                    pass  # the fd listdir used for the directory itself, closed by now
+        return
+
+
+def init_worker(core_masks: List[Set[int]], counter) -> None:
+    """
+    Pool initializer: seal the worker's fds, then pin it if core_masks is non-empty.
+    """
+    seal_worker_fds()
+    if core_masks:
+        pin_worker(core_masks, counter)
+
+
+@contextlib.contextmanager
+def make_executor(
+    jobs: int, core_masks: Optional[List[Set[int]]] = None
+) -> Iterator[ProcessPoolExecutor]:
+    """
+    Process pool shared by every phase of a run. Workers are started from a forkserver
+    so the Python-side bookkeeping of each task runs outside the parent's GIL. Work
+    still queued when the block exits early (error, Ctrl-C) is cancelled, not drained.
+    With core_masks, each worker is pinned to one physical core.
+    """
+    ctx = multiprocessing.get_context("forkserver")
+    ex = ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=ctx,
+        initializer=init_worker,
+        initargs=(core_masks or [], ctx.Value("L", 0)),
+    )
+    try:
+        yield ex
+    finally:
+        ex.shutdown(wait=True, cancel_futures=True)
+
+
+def hash_file(file_path: str) -> str:
+    """
+    BLAKE2b digest of a file's contents, read through mmap.
+    """
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return hashlib.blake2b(b"", digest_size=16).hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            return hashlib.blake2b(m, digest_size=16).hexdigest()
+
+
+def baseline_cache_path() -> Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(cache_home) / "chuckfmt_syntax" / "baseline.json"
 
 
-def gather_with_progress(futures, total: int, label: str, every: int = 25):
+def tree_digest(root: str, digests: Dict[str, str]) -> str:
     """
-    Yield each future.result() while printing an in-place progress counter to stderr.
+    BLAKE2b over every .ck file's path relative to root and its content digest.
     """
-    done = 0
-    for fut in as_completed(futures):
-        done += 1
-        if done == 1 or done == total or (every > 0 and done % every == 0):
-            print(f"\r{label}: {done}/{total}", end="", file=sys.stderr, flush=True)
-        yield fut.result()
-    print(file=sys.stderr)  # newline after finishing the phase
+    h = hashlib.blake2b(digest_size=16)
+    for p in sorted(digests):
+        h.update(f"{os.path.relpath(p, root)}\0{digests[p]}\n".encode())
+    return h.hexdigest()
+
+
+def baseline_cache_key(chuck_bin: str, chuck_args: List[str], timeout: float, tree: str) -> str:
+    """
+    Cached results are only valid for the same chuck binary, args and timeout, and for
+    the same tree: a file's result also depends on the files it pulls in (Machine.add,
+    @import), so any .ck change anywhere invalidates all of them. The binary's size and
+    mtime are folded in so upgrading chuck invalidates them too.
+    """
+    resolved = shutil.which(chuck_bin) or chuck_bin
+    try:
+        st = os.stat(resolved)
+        stamp = [st.st_size, st.st_mtime_ns]
+    except OSError:
+        stamp = []
+    return json.dumps([resolved, stamp, chuck_args, timeout, tree])
+
+
+def load_baseline_cache(path: Path, key: str) -> Dict[str, Tuple[str, int]]:
+    try:
+        data = json.loads(path.read_text())
+        return {digest: (st, rc) for digest, (st, rc) in data.get(key, {}).items()}
+    except (OSError, ValueError, TypeError, AttributeError):
+        return {}
+
+
+def save_baseline_cache(path: Path, key: str, entries: Dict[str, Tuple[str, int]]) -> None:
+    """
+    Keys are per tree, so only the latest key is kept; older ones could only ever match
+    an exact earlier state of the tree and would make the file grow with every edit.
+    """
+    try:
+        data = json.loads(path.read_text())
+        merged = data.get(key) if isinstance(data, dict) else None
+    except (OSError, ValueError):
+        merged = None
+    if not isinstance(merged, dict):
+        merged = {}
+    merged.update({digest: [st, rc] for digest, (st, rc) in entries.items()})
+    data = {key: merged}
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data))
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"WARNING: could not write baseline cache {path}: {e}", file=sys.stderr)
+
+
+class PhaseProgress:
+    """
+    In-place "label: done/total" counter on stderr. tick() only bumps the count; a
+    background thread repaints the line at most every `interval` seconds, so the
+    printing cost doesn't grow with the number of completed tasks.
+    """
+
+    def __init__(self, total: int, label: str, interval: float = 0.1):
+        self.total = total
+        self.label = label
+        self.interval = interval
+        self.done = 0
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.printer = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self) -> "PhaseProgress":
+        self.printer.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stopped.set()
+        self.printer.join()
+        self._print()
+        print(file=sys.stderr)  # newline after finishing the phase
+
+    def tick(self, n: int = 1) -> None:
+        with self.lock:
+            self.done += n
+
+    def _print(self) -> None:
+        print(f"\r{self.label}: {self.done}/{self.total}", end="", file=sys.stderr, flush=True)
+
+    def _run(self) -> None:
+        shown = -1
+        while not self.stopped.wait(self.interval):
+            if self.done != shown:
+                shown = self.done
+                self._print()
 
 
 def to_text(x) -> str:
@@ -36,49 +331,167 @@ def to_text(x) -> str:
     return x
 
 
+def read_bounded(
+    proc: subprocess.Popen, timeout: float, limit: int = CAPTURE_LIMIT
+) -> Tuple[bytes, bool, bool]:
+    """
+    Drain proc.stdout into a buffer of at most `limit` bytes, scanning each chunk with
+    SYNTAX_RE as it arrives. Returns (captured, needle_found, timed_out).
+    The child is killed on timeout and always reaped.
+    """
+    buf = bytearray()
+    found = False
+    carry = b""
+    overlap = len(SYNTAX_NEEDLE) - 1
+    deadline = time.monotonic() + timeout
+    fd = proc.stdout.fileno()
+    try:
+        with selectors.DefaultSelector() as sel:
+            sel.register(fd, selectors.EVENT_READ)
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise subprocess.TimeoutExpired(proc.args, timeout)
+                if not sel.select(remaining):
+                    continue
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    break
+                if len(buf) < limit:
+                    buf += chunk[: limit - len(buf)]
+                if not found:
+                    # carry the previous chunk's tail so matches spanning two reads are seen
+                    found = bool(
+                        SYNTAX_RE.search(chunk) or SYNTAX_RE.search(carry + chunk[:overlap])
+                    )
+                    carry = (carry + chunk[-overlap:])[-overlap:]
+                if found and proc.poll() is not None:
+                    break
+        proc.wait(timeout=max(0.0, deadline - time.monotonic()))
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        return bytes(buf), found, True
+    finally:
+        proc.stdout.close()
+    return bytes(buf), found, False
+
+
+def run_chuck(
+    cmd: List[str], timeout: float, keep_output: bool = True
+) -> Tuple[str, int, Optional[str]]:
+    """
+    Run one chuck command and classify it as (status, rc, combined output). The output
+    is only ever shown for failures, so it is None for ok and timeout results, and for
+    failures too unless keep_output is set.
+    """
+    # stderr is folded into stdout: one pipe per child instead of two, and
+    # only a single fd to drain. See main() for why close_fds is off.
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, close_fds=False)
+    out, found, timed_out = read_bounded(proc, timeout)
+
+    if timed_out:
+        return "timeout", 124, None
+
+    if found:
+        return "fail", proc.returncode, to_text(out).strip() if keep_output else None
+
+    return "ok", proc.returncode, None
+
+
 def chuck_check_one(
     chuck_bin: str,
     chuck_args: List[str],
-    file_path: Path,
+    file_path: str,
     timeout: float,
-) -> Tuple[Path, str, int, str]:
-    cmd = [chuck_bin] + chuck_args + [str(file_path)]
+    keep_output: bool = True,
+) -> Tuple[str, str, int, Optional[str]]:
+    cmd = [chuck_bin] + chuck_args + [file_path]
+    status, rc, combined = run_chuck(cmd, timeout, keep_output)
+    return file_path, status, rc, combined
+
+
+def chuck_check_batch(
+    chuck_bin: str,
+    chuck_args: List[str],
+    file_paths: List[str],
+    timeout: float,
+    keep_output: bool = True,
+) -> List[Tuple[str, str, int, Optional[str]]]:
+    """
+    Check several files with a single chuck process. chuck compiles every file on its
+    command line before running them, so a clean exit without "syntax error" clears the
+    whole batch. Anything else (fail, timeout, non-zero rc) can't be attributed to one
+    file, so those batches are re-checked file by file.
+    """
+    if len(file_paths) == 1:
+        return [chuck_check_one(chuck_bin, chuck_args, file_paths[0], timeout, keep_output)]
+
+    status, rc, _ = run_chuck([chuck_bin] + chuck_args + file_paths, timeout, keep_output=False)
+    if status == "ok" and rc == 0:
+        return [(p, "ok", rc, None) for p in file_paths]
+
+    return [chuck_check_one(chuck_bin, chuck_args, p, timeout, keep_output) for p in file_paths]
+
+
+def chunked(items: List[str], size: int) -> List[List[str]]:
+    size = max(1, size)
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
 
+def format_argv(fmt_argv_template: List[str], index: int, file_path: str) -> List[str]:
+    argv = list(fmt_argv_template)
+    argv[index] = fmt_argv_template[index].replace("{}", file_path)
+    return argv
+
+
+def prewarm(argv: List[str]) -> None:
+    """
+    Run a command once, serially, so its binary and shared libraries are already in the
+    page cache when the parallel fan-out starts. Any failure is ignored.
+    """
     try:
-        cp = subprocess.run(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            timeout=timeout,
+        subprocess.run(
+            argv,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=5,
         )
-        out = to_text(cp.stdout)
-        err = to_text(cp.stderr)
-        combined = (out + "\n" + err).strip()
+    except (OSError, subprocess.SubprocessError):
+        pass
 
-        haystack = (out + "\n" + err).lower()
-        if "syntax error" in haystack:
-            return file_path, "fail", cp.returncode, combined
 
-        return file_path, "ok", cp.returncode, combined
-
-    except subprocess.TimeoutExpired as e:
-        out = to_text(e.stdout)
-        err = to_text(e.stderr)
-        combined = (out + "\n" + err + "\n[TIMEOUT]").strip()
-        return file_path, "timeout", 124, combined
+def format_one(
+    fmt_argv_template: List[str], index: int, file_path: str
+) -> Tuple[str, int, str, Optional[str]]:
+    """
+    Run the formatter directly, without a shell. fmt_argv_template is the shlex-split
+    --format-cmd and `index` the element holding '{}', which may be the whole token
+    ("chuckfmt -i {}") or part of one ("fmt --in={}").
+    Also returns the formatted file's digest (None if the formatter failed).
+    """
+    argv = format_argv(fmt_argv_template, index, file_path)
+    try:
+        cp = subprocess.run(
+            argv, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, close_fds=False
+        )
+    except OSError as e:
+        return file_path, 127, str(e), None
+    msg = (cp.stdout + "\n" + cp.stderr).strip()
+    digest = hash_file(file_path) if cp.returncode == 0 else None
+    return file_path, cp.returncode, msg, digest
 
 
-def format_one(format_cmd_template: str, file_path: Path) -> Tuple[Path, int, str]:
+def format_one_shell(
+    prefix: str, suffix: str, file_path: str
+) -> Tuple[str, int, str, Optional[str]]:
     """
-    format_cmd_template must contain '{}' where the file path should go, e.g.:
-      "chuckfmt -i {}"
+    prefix and suffix are --format-cmd split once around its '{}' placeholder, e.g.
+      "chuckfmt -i {}" -> ("chuckfmt -i ", "")
     This is run via the shell so you can use any CLI syntax.
     """
-    if "{}" not in format_cmd_template:
-        raise ValueError("format-cmd must include '{}' placeholder for the file path")
-
-    cmd_str = format_cmd_template.format(shlex.quote(str(file_path)))
+    cmd_str = prefix + shlex.quote(file_path) + suffix
 
     cp = subprocess.run(
         cmd_str,
@@ -88,7 +501,120 @@ def format_one(format_cmd_template: str, file_path: Path) -> Tuple[Path, int, st
         text=True,
     )
     msg = (cp.stdout + "\n" + cp.stderr).strip()
-    return file_path, cp.returncode, msg
+    digest = hash_file(file_path) if cp.returncode == 0 else None
+    return file_path, cp.returncode, msg, digest
+
+
+class FormatDaemon:
+    """
+    Client for a long-running formatter that reads one file path per line on stdin and,
+    once that file is formatted in place, answers "<path>\\t<rc>" on stdout. Each
+    submitted path gets a Future resolving to (path, rc, msg, None) like a format_one
+    task; the digest is left for the caller to compute.
+    """
+
+    def __init__(self, cmd: str):
+        self.proc = subprocess.Popen(
+            shlex.split(cmd),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+        )
+        self.lock = threading.Lock()
+        self.pending: Dict[str, Future] = {}
+        self.failure: Optional[Tuple[int, str]] = None  # (rc, msg) once the daemon is gone
+        self.aborted = threading.Event()  # set on an exceptional exit: send nothing more
+        self.requests: "queue.Queue[Optional[str]]" = queue.Queue()
+        self.writer = threading.Thread(target=self._write, daemon=True)
+        self.reader = threading.Thread(target=self._read, daemon=True)
+        self.writer.start()
+        self.reader.start()
+
+    def __enter__(self) -> "FormatDaemon":
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        self.close(abort=exc_type is not None)
+
+    def submit(self, file_path: str) -> Future:
+        fut: Future = Future()
+        with self.lock:
+            if self.failure is not None:
+                fut.set_result((file_path, *self.failure, None))
+                return fut
+            self.pending[file_path] = fut
+        self.requests.put(file_path)
+        return fut
+
+    def close(self, abort: bool = False) -> None:
+        """
+        Send EOF and wait for the daemon to exit, terminating it after DAEMON_EXIT_TIMEOUT.
+        With abort, queued paths are dropped and the daemon is terminated right away, as
+        it may still have plenty of paths buffered on its stdin.
+        """
+        if abort:
+            self.aborted.set()
+        self.requests.put(None)
+        if abort:
+            self._terminate()
+        deadline = time.monotonic() + DAEMON_EXIT_TIMEOUT
+        self.writer.join(DAEMON_EXIT_TIMEOUT)
+        self.reader.join(max(0.0, deadline - time.monotonic()))
+        if self.writer.is_alive() or self.reader.is_alive():
+            self._terminate()
+            self.writer.join()
+            self.reader.join()
+
+    def _terminate(self) -> None:
+        self.proc.terminate()
+        try:
+            self.proc.wait(DAEMON_EXIT_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+
+    def _write(self) -> None:
+        try:
+            while True:
+                path = self.requests.get()
+                if path is None or self.aborted.is_set():
+                    break
+                self.proc.stdin.write(path + "\n")
+        except OSError:
+            pass  # daemon went away; _read fails whatever is still pending
+        finally:
+            try:
+                self.proc.stdin.close()
+            except OSError:
+                pass
+
+    def _read(self) -> None:
+        for line in self.proc.stdout:
+            path, _, rc = line.rstrip("\n").partition("\t")
+            with self.lock:
+                fut = self.pending.pop(path, None)
+            if fut is None:
+                # A reply that matches no request (e.g. the daemon rewrote the path) would
+                # leave that request waiting forever, so treat it as a protocol error.
+                self.proc.kill()
+                self.proc.wait()
+                self._fail_pending(1, f"format daemon replied for an unknown path: {line.strip()}")
+                return
+            try:
+                fut.set_result((path, int(rc), "", None))
+            except ValueError:
+                msg = f"unexpected format daemon reply: {line.strip()}"
+                fut.set_result((path, 1, msg, None))
+
+        rc = self.proc.wait()
+        self._fail_pending(rc or 1, "format daemon exited before answering")
+
+    def _fail_pending(self, rc: int, msg: str) -> None:
+        with self.lock:
+            self.failure = (rc, msg)
+            leftover, self.pending = self.pending, {}
+        for path, fut in leftover.items():
+            fut.set_result((path, rc, msg, None))
 
 
 def main() -> int:
@@ -96,11 +622,24 @@ def main() -> int:
         description="Test that chuckfmt formatting does not introduce ChucK syntax errors."
     )
     ap.add_argument("--src", required=True, help="Path to example codebase root")
-    ap.add_argument(
+    fmt = ap.add_mutually_exclusive_group(required=True)
+    fmt.add_argument(
         "--format-cmd",
-        required=True,
         help="Formatter command template with '{}' placeholder, e.g. \"chuckfmt -i {}\"",
     )
+    fmt.add_argument(
+        "--format-daemon-cmd",
+        help="Persistent formatter started once and fed one path per line on stdin; "
+        "it must reply '<path>\\t<rc>' per line, echoing the path exactly as sent, after "
+        "formatting that file in place, and exit once stdin is closed (it is terminated "
+        f"after {DAEMON_EXIT_TIMEOUT:g}s otherwise)",
+    )
+    ap.add_argument(
+        "--format-shell",
+        action="store_true",
+        help="Run --format-cmd through /bin/sh (for pipes, redirections, etc.) "
+        "instead of executing it directly",
+    )
     ap.add_argument("--chuck", default="chuck", help="Path to chuck binary (default: chuck)")
     ap.add_argument(
         "--chuck-args",
@@ -118,8 +657,23 @@ def main() -> int:
     ap.add_argument(
         "--jobs",
         type=int,
-        default=max(4, (os.cpu_count() or 8)),
-        help="Parallel workers (default: max(4, cpu_count))",
+        default=None,
+        help="Parallel workers (default: max(4, physical cores) with --physical-cores-only, "
+        "else max(4, cpu_count))",
+    )
+    ap.add_argument(
+        "--physical-cores-only",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Pin workers round-robin to physical cores so chuck processes don't compete on "
+        "hyperthread siblings (Linux only; default: on)",
+    )
+    ap.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help="Files per chuck invocation (default: 1). Batches that fail or time out are "
+        "re-checked one file at a time, so this only pays off when most files exit quickly.",
     )
     ap.add_argument(
         "--copy-ignore",
@@ -127,67 +681,240 @@ def main() -> int:
         help="Comma-separated dir names to ignore when copying (default: .git,node_modules,target,build,dist)",
     )
     ap.add_argument(
-        "--progress-every",
-        type=int,
-        default=25,
-        help="Print progress every N completed files per phase (default: 25)",
+        "--link-assets",
+        action="store_true",
+        help="Hardlink non-.ck files into the work tree instead of copying them. Only use this "
+        "if no script writes files (e.g. via me.dir()), or the source tree gets overwritten",
     )
+    ap.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not reuse or record baseline results in ~/.cache/chuckfmt_syntax/baseline.json "
+        "(results are only reused while no .ck file in the tree has changed)",
+    )
+    ap.add_argument(
+        "--progress-interval",
+        type=float,
+        default=0.1,
+        help="Seconds between progress updates on stderr (default: 0.1)",
+    )
+    # superseded by --progress-interval; still accepted so existing invocations keep working
+    ap.add_argument("--progress-every", type=int, help=argparse.SUPPRESS)
 
     args = ap.parse_args()
+    if args.batch_size < 1:
+        ap.error("--batch-size must be at least 1")
 
     src_root = Path(args.src).resolve()
     if not src_root.exists():
         print(f"ERROR: --src does not exist: {src_root}", file=sys.stderr)
         return 2
 
-    chuck_bin = args.chuck
+    if args.format_cmd is not None:
+        fmt_argv_template = shlex.split(args.format_cmd)
+        fmt_index = next((i for i, tok in enumerate(fmt_argv_template) if "{}" in tok), -1)
+        if fmt_index < 0:
+            print(
+                "ERROR: --format-cmd must include '{}' placeholder for the file path",
+                file=sys.stderr,
+            )
+            return 2
+        fmt_prefix, _, fmt_suffix = args.format_cmd.partition("{}")
+        if fmt_index > 0 and not args.format_shell:
+            resolved = shutil.which(fmt_argv_template[0])
+            if resolved is None:
+                print(f"ERROR: formatter not found: {fmt_argv_template[0]}", file=sys.stderr)
+                return 2
+            fmt_argv_template[0] = resolved
+
+    if args.format_daemon_cmd is not None:
+        daemon_argv = shlex.split(args.format_daemon_cmd)
+        if not daemon_argv or shutil.which(daemon_argv[0]) is None:
+            print(f"ERROR: format daemon not found: {args.format_daemon_cmd}", file=sys.stderr)
+            return 2
+
+    core_masks = physical_core_masks() if args.physical_cores_only else []
+    if args.jobs is None:
+        args.jobs = max(4, len(core_masks) if core_masks else (os.cpu_count() or 8))
+
+    # Spawn chuck and the formatter by absolute path with no preexec_fn, pass_fds or cwd:
+    # only then does subprocess use posix_spawn instead of forking the worker. Before
+    # Python 3.13 close_fds=True also forces fork, so it is left off; instead each worker
+    # marks the pool pipes it inherits from the forkserver non-inheritable at startup
+    # (see seal_worker_fds), and fds opened later are non-inheritable anyway (PEP 446).
+    chuck_bin = shutil.which(args.chuck)
+    if chuck_bin is None:
+        print(f"ERROR: chuck binary not found: {args.chuck}", file=sys.stderr)
+        return 2
     chuck_args = args.chuck_args  # already a list (REMAINDER)
 
     ignore_names = {s.strip() for s in args.copy_ignore.split(",") if s.strip()}
 
-    def ignore_func(_dirpath: str, names: List[str]) -> List[str]:
-        return [n for n in names if n in ignore_names]
-
-    with tempfile.TemporaryDirectory(prefix="chuckfmt_syntax_") as td:
+    with contextlib.ExitStack() as run:
+        td = run.enter_context(tempfile.TemporaryDirectory(prefix="chuckfmt_syntax_"))
+        ex = run.enter_context(make_executor(args.jobs, core_masks))
         work_root = Path(td) / "work"
-        shutil.copytree(src_root, work_root, ignore=ignore_func, dirs_exist_ok=True)
+        clone_tree(src_root, work_root, ignore_names, ex, args.link_assets)
 
-        ck_files = find_ck_files(work_root)
+        ck_files = find_ck_files(str(work_root), ignore_names)
         if not ck_files:
             print("No .ck files found.", file=sys.stderr)
             return 2
 
         print(f"Copied to: {work_root}")
         print(f"Found {len(ck_files)} .ck files")
+        pinning = f", pinned to {len(core_masks)} physical cores" if core_masks else ""
+        print(f"Workers: {args.jobs}{pinning}")
         print(f"Baseline check: {chuck_bin} {' '.join(chuck_args)} (timeout={args.timeout}s)")
-        print(f"Formatting with: {args.format_cmd}")
+        print(f"Formatting with: {args.format_daemon_cmd or args.format_cmd}")
+
+        # 0) Pull chuck and the formatter into the page cache before the parallel start
+        prewarm([chuck_bin, "--help"])
+        if args.format_cmd is not None:
+            dummy = os.path.join(td, "prewarm.ck")
+            Path(dummy).touch()
+            if args.format_shell:
+                prewarm(["/bin/sh", "-c", fmt_prefix + shlex.quote(dummy) + fmt_suffix])
+            else:
+                prewarm(format_argv(fmt_argv_template, fmt_index, dummy))
+
+        # 1) Baseline check. This is a barrier: ChucK files pull in other files
+        # (Machine.add(me.dir() + ...), @import), so every baseline has to see the whole
+        # unformatted tree before the formatter rewrites anything.
+        digests: Dict[str, str] = dict(zip(ck_files, ex.map(hash_file, ck_files, chunksize=32)))
+        cache_path = baseline_cache_path()
+        cache_key = baseline_cache_key(
+            chuck_bin, chuck_args, args.timeout, tree_digest(str(work_root), digests)
+        )
+        cached: Dict[str, Tuple[str, int]] = {}
+        if not args.no_cache:
+            cached = load_baseline_cache(cache_path, cache_key)
+
+        daemon: Optional[FormatDaemon] = None
+        if args.format_daemon_cmd:
+            daemon = run.enter_context(FormatDaemon(args.format_daemon_cmd))
+
+        # baseline output is never shown; after output is only kept for failures
+        baseline: Dict[str, Tuple[str, int]] = {}
+        after: Dict[str, Tuple[str, int, Optional[str]]] = {}
+        format_failures: List[Tuple[str, int, str]] = []
+        recheck: List[str] = []  # formatted and changed, waiting to fill an after-check batch
+        batch_size = max(1, args.batch_size)  # same clamp as chunked()
+        provisional: List[str] = []  # failed an after check that overlapped formatting
+        # Finished futures are pushed here by their done callbacks. wait(FIRST_COMPLETED)
+        # would re-register a waiter on every outstanding future per call, O(N^2) overall.
+        done: "queue.Queue[Tuple[str, str, Future]]" = queue.Queue()
+        in_flight = 0
+        upstream = 0  # pending format/hash futures, i.e. files still being rewritten
+        unchanged = 0
+
+        def submit(stage: str, fut: Future, path: str = "") -> None:
+            nonlocal in_flight, upstream
+            in_flight += 1
+            if stage != "after":
+                upstream += 1
+            fut.add_done_callback(lambda f: done.put((stage, path, f)))
+
+        def start_format(p: str) -> None:
+            if daemon is not None:
+                submit("format", daemon.submit(p))
+            elif args.format_shell:
+                submit("format", ex.submit(format_one_shell, fmt_prefix, fmt_suffix, p))
+            else:
+                submit("format", ex.submit(format_one, fmt_argv_template, fmt_index, p))
+
+        def formatted(p: str, digest: str) -> None:
+            nonlocal unchanged
+            if digest == digests[p]:
+                after[p] = (*baseline[p], None)
+                unchanged += 1
+                progress.tick(1)
+            else:
+                recheck.append(p)
 
-        # 1) Baseline check
-        baseline: Dict[Path, Tuple[str, int, str]] = {}
-        with ThreadPoolExecutor(max_workers=args.jobs) as ex:
+        todo: List[str] = []
+        for p in ck_files:
+            hit: Optional[Tuple[str, int]] = cached.get(digests[p])
+            if hit is not None:
+                baseline[p] = hit
+            else:
+                todo.append(p)
+        if len(todo) < len(ck_files):
+            print(f"Baseline cache: reusing {len(ck_files) - len(todo)} results")
+
+        progress = PhaseProgress(3 * len(ck_files), "Check/format/re-check", args.progress_interval)
+        with progress:
+            progress.tick(len(baseline))
             futs = [
-                ex.submit(chuck_check_one, chuck_bin, chuck_args, p, args.timeout) for p in ck_files
+                ex.submit(chuck_check_batch, chuck_bin, chuck_args, chunk, args.timeout, False)
+                for chunk in chunked(todo, args.batch_size)
             ]
-            for p, status, rc, msg in gather_with_progress(
-                futs, len(futs), "Baseline check", every=args.progress_every
-            ):
-                baseline[p] = (status, rc, msg)
-
-        # 2) Format all files
-        print("Running formatter...")
-        format_failures: List[Tuple[Path, int, str]] = []
-        with ThreadPoolExecutor(max_workers=args.jobs) as ex:
-            futs = [ex.submit(format_one, args.format_cmd, p) for p in ck_files]
-            for p, rc, msg in gather_with_progress(
-                futs, len(futs), "Formatting", every=args.progress_every
-            ):
-                if rc != 0:
-                    format_failures.append((p, rc, msg))
+            for fut in as_completed(futs):
+                results = fut.result()
+                for p, status, rc, _ in results:
+                    baseline[p] = (status, rc)
+                progress.tick(len(results))
+
+            # 2-3) Format -> after check, pipelined per file: a changed file is re-checked as
+            # soon as it has been formatted. Such an early check can still read a dependency
+            # that is being rewritten at that moment, so its failures are only provisional
+            # and are checked again once every file has been formatted.
+            for p in ck_files:
+                start_format(p)
+
+            while in_flight:
+                stage, path, fut = done.get()
+                in_flight -= 1
+                if stage != "after":
+                    upstream -= 1
+
+                if stage == "format":
+                    p, rc, msg, digest = fut.result()
+                    progress.tick(1)
+                    if rc != 0:
+                        format_failures.append((p, rc, msg))
+                    elif digest is None:
+                        submit("hash", ex.submit(hash_file, p), p)
+                    else:
+                        formatted(p, digest)
+                elif stage == "hash":
+                    formatted(path, fut.result())
+                else:
+                    overlapped = path == "overlapped"
+                    for p, status, rc, msg in fut.result():
+                        if status == "fail" and overlapped:
+                            provisional.append(p)
+                        else:
+                            after[p] = (status, rc, msg)
+                            progress.tick(1)
+
+                # once any file failed to format the run is lost; don't start more checks
+                if format_failures:
+                    recheck.clear()
+                    provisional.clear()
+                if upstream == 0:
+                    recheck.extend(provisional)
+                    provisional.clear()
+                while recheck and (len(recheck) >= batch_size or upstream == 0):
+                    chunk = recheck[:batch_size]
+                    del recheck[:batch_size]
+                    submit(
+                        "after",
+                        ex.submit(chuck_check_batch, chuck_bin, chuck_args, chunk, args.timeout),
+                        "overlapped" if upstream else "",
+                    )
+
+        if not args.no_cache:
+            save_baseline_cache(
+                cache_path,
+                cache_key,
+                {digests[p]: (st, rc) for p, (st, rc) in baseline.items() if st != "fail"},
+            )
 
         if format_failures:
             print("\nFormatter failures:")
-            for p, rc, msg in sorted(format_failures, key=lambda x: str(x[0])):
-                rel = p.relative_to(work_root)
+            for p, rc, msg in sorted(format_failures):
+                rel = Path(p).relative_to(work_root)
                 print(f"  - {rel} (rc={rc})")
                 if msg:
                     print("    ---")
@@ -197,21 +924,12 @@ def main() -> int:
                         print("    ... (truncated)")
             return 1
 
-        # 3) Post-format check
-        print("Re-checking syntax after formatting...")
-        after: Dict[Path, Tuple[str, int, str]] = {}
-        with ThreadPoolExecutor(max_workers=args.jobs) as ex:
-            futs = [
-                ex.submit(chuck_check_one, chuck_bin, chuck_args, p, args.timeout) for p in ck_files
-            ]
-            for p, status, rc, msg in gather_with_progress(
-                futs, len(futs), "After check", every=args.progress_every
-            ):
-                after[p] = (status, rc, msg)
+        if unchanged:
+            print(f"Unchanged by formatter: {unchanged} files (baseline reused)")
 
         # 4) Regressions: baseline ok/timeout -> after fail
-        regressions: List[Tuple[Path, Tuple[str, int, str], Tuple[str, int, str]]] = []
-        baseline_fails: List[Path] = []
+        regressions: List[Tuple[str, Tuple[str, int], Tuple[str, int, Optional[str]]]] = []
+        baseline_fails: List[str] = []
 
         for p in ck_files:
             b = baseline[p]
@@ -223,14 +941,14 @@ def main() -> int:
                 if a[0] == "fail":
                     regressions.append((p, b, a))
 
-        def count_status(d: Dict[Path, Tuple[str, int, str]]) -> Dict[str, int]:
+        def count_status(statuses: Iterable[str]) -> Dict[str, int]:
             c = {"ok": 0, "timeout": 0, "fail": 0}
-            for st, _, _ in d.values():
+            for st in statuses:
                 c[st] = c.get(st, 0) + 1
             return c
 
-        bcnt = count_status(baseline)
-        acnt = count_status(after)
+        bcnt = count_status(b[0] for b in baseline.values())
+        acnt = count_status(a[0] for a in after.values())
 
         print("\nSummary")
         print(f"  Baseline: ok={bcnt['ok']} timeout={bcnt['timeout']} fail={bcnt['fail']}")
@@ -242,8 +960,8 @@ def main() -> int:
 
         if regressions:
             print("\nREGRESSIONS (formatting introduced 'syntax error' in stdout):")
-            for p, b, a in sorted(regressions, key=lambda x: str(x[0])):
-                rel = p.relative_to(work_root)
+            for p, b, a in sorted(regressions):
+                rel = Path(p).relative_to(work_root)
                 print(f"\n  - {rel}")
                 print(f"    baseline: {b[0]} (rc={b[1]})")
                 print(f"    after:    {a[0]} (rc={a[1]})")